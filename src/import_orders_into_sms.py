@@ -1,40 +1,52 @@
+import atexit
 import os
 import requests
 import json
+import random
 import time
 import pyodbc
 import configparser
 import logging
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener
 from datetime import datetime
 import sys
 import ctypes
+from requests.adapters import HTTPAdapter
 from requests.exceptions import HTTPError, Timeout, RequestException
+from urllib3.util.retry import Retry
 from http_errors import HTTP_ERROR_MESSAGES
 
+from concurrent.futures import ThreadPoolExecutor
+
 # --- UI ---
 import threading
-from queue import Queue
+from queue import Queue, SimpleQueue
 
 UI_ENABLED = True  # False si tu veux silent mode (ex: lancé par SQI sans UI)
 ui = None
-ui_queue = Queue()
+# SimpleQueue: C-implemented, lower per-op overhead than Queue, and
+# put/get_nowait/Empty are all the UI pump needs
+ui_queue = SimpleQueue()
 
 if UI_ENABLED:
     from ui_status import StatusUI
 
 
+# --------------------------
+# Base directory (script and frozen EXE resolve the same way; computed once)
+# --------------------------
+base_dir = (
+    os.path.dirname(sys.executable)
+    if getattr(sys, "frozen", False)
+    else os.path.dirname(os.path.abspath(__file__))
+)
+
+
 def get_config_path():
-    script_dir = (
-        os.path.dirname(sys.executable)
-        if getattr(sys, "frozen", False)
-        else os.path.dirname(os.path.abspath(__file__))
-    )
-    return os.path.join(script_dir, "config.ini")
+    return os.path.join(base_dir, "config.ini")
 
 
-def read_debugscreen(config_path: str) -> bool:
-    cfg = configparser.ConfigParser()
-    cfg.read(config_path)
+def read_debugscreen(cfg: configparser.ConfigParser) -> bool:
     return cfg.getint("Settings", "DebugScreen", fallback=0) == 1
 
 
@@ -45,6 +57,9 @@ def ensure_console():
     if os.name != "nt":
         return
 
+    import io
+    import msvcrt
+
     kernel32 = ctypes.windll.kernel32
 
     if kernel32.GetConsoleWindow():
@@ -53,27 +68,60 @@ def ensure_console():
     if kernel32.AllocConsole() == 0:
         return
 
-    sys.stdout = open("CONOUT$", "w", buffering=1, encoding="utf-8", errors="replace")
-    sys.stderr = open("CONOUT$", "w", buffering=1, encoding="utf-8", errors="replace")
-    sys.stdin  = open("CONIN$", "r", encoding="utf-8", errors="replace")
+    def _console_writer(std_handle):
+        # Block-buffered writer on the real console handle: one Win32 WriteFile
+        # per 8KB buffer instead of one per line with CONOUT$ + buffering=1.
+        handle = kernel32.GetStdHandle(std_handle)
+        fd = msvcrt.open_osfhandle(handle, os.O_WRONLY)
+        return io.TextIOWrapper(
+            io.BufferedWriter(io.FileIO(fd, "w", closefd=False), buffer_size=8192),
+            encoding="utf-8",
+            errors="replace",
+            line_buffering=False,
+        )
+
+    sys.stdout = _console_writer(-11)  # STD_OUTPUT_HANDLE
+    sys.stderr = _console_writer(-12)  # STD_ERROR_HANDLE
+    sys.stdin = open("CONIN$", "r", encoding="utf-8", errors="replace")
+
+    atexit.register(_flush_console_streams)
+
+
+def _flush_console_streams():
+    for stream in (sys.stdout, sys.stderr):
+        try:
+            stream.flush()
+        except Exception:
+            pass
+
+
+# Producer-side coalescing for INFO status pings: repeated progress updates
+# with the same message are capped at ~10 Hz so the Tk queue can't flood.
+_ui_last_push_ts = 0.0
+_ui_last_msg = None
 
 
 def status(msg, detail=""):
+    global _ui_last_push_ts, _ui_last_msg
     logging.info(msg + (f" | {detail}" if detail else ""))
     if UI_ENABLED:
-        ui_queue.put(("INFO", msg, detail))
+        now = time.monotonic()
+        if msg != _ui_last_msg or now - _ui_last_push_ts >= 0.1:
+            ui_queue.put_nowait(("INFO", msg, detail))
+            _ui_last_push_ts = now
+            _ui_last_msg = msg
 
 
 def ui_error(msg, detail=""):
     logging.error(msg + (f" | {detail}" if detail else ""))
     if UI_ENABLED:
-        ui_queue.put(("ERROR", msg, detail))
+        ui_queue.put_nowait(("ERROR", msg, detail))
 
 
 def ui_warn(msg, detail=""):
     logging.warning(msg + (f" | {detail}" if detail else ""))
     if UI_ENABLED:
-        ui_queue.put(("WARN", msg, detail))
+        ui_queue.put_nowait(("WARN", msg, detail))
 
 
 def explain_http_exception(exc: Exception, context: str = ""):
@@ -115,10 +163,26 @@ def explain_http_exception(exc: Exception, context: str = ""):
     return ("Error", prefix + str(exc))
 
 
+# Single keep-alive session shared by login/job/status calls so each request
+# reuses the same TCP+TLS connection instead of a fresh handshake per call.
+# Retries cover transient gateway errors on idempotent calls (status polls);
+# POSTs are deliberately not retried so a flaky 502 can't create a second job.
+SESSION = requests.Session()
+SESSION.headers.update({"Content-Type": "application/json"})
+
+_adapter = HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=4,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504]),
+)
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
+
+
 def request_json(method: str, url: str, *, headers=None, json_body=None, timeout=90, context=""):
     """
     Unified request helper that:
-      - runs requests.<method>
+      - runs SESSION.<method> (keep-alive)
       - raise_for_status
       - returns response.json()
       - on error: maps to friendly message (http_errors.py) + ui_error + re-raises
@@ -126,9 +190,9 @@ def request_json(method: str, url: str, *, headers=None, json_body=None, timeout
     try:
         m = method.strip().lower()
         if m == "get":
-            resp = requests.get(url, headers=headers, timeout=timeout)
+            resp = SESSION.get(url, headers=headers, timeout=timeout)
         elif m == "post":
-            resp = requests.post(url, headers=headers, json=json_body, timeout=timeout)
+            resp = SESSION.post(url, headers=headers, json=json_body, timeout=timeout)
         else:
             raise ValueError(f"Unsupported HTTP method: {method}")
 
@@ -151,19 +215,20 @@ def request_json(method: str, url: str, *, headers=None, json_body=None, timeout
 
 
 # --------------------------
-# Base directory
-# --------------------------
-base_dir = (
-    os.path.dirname(sys.executable)
-    if getattr(sys, "frozen", False)
-    else os.path.dirname(os.path.abspath(__file__))
-)
-
-# --------------------------
-# Config path + DebugScreen (DOIT être avant logging.basicConfig)
+# Config loading (une seule passe) + DebugScreen (DOIT être avant logging.basicConfig)
 # --------------------------
 config_path = get_config_path()
-debug_console = read_debugscreen(config_path)
+
+# A missing config.ini is the most common deployment mistake; defer the
+# failure until after logging is up so the windowed EXE leaves a trace of the
+# path it tried (an empty parser just yields the DebugScreen fallback here).
+_config_missing = not os.path.exists(config_path)
+
+config = configparser.ConfigParser()
+if not _config_missing:
+    config.read(config_path)
+
+debug_console = read_debugscreen(config)
 
 if debug_console:
     ensure_console()
@@ -193,41 +258,65 @@ if debug_console:
     console.setFormatter(logging.Formatter("[%(asctime)s]: %(message)s", datefmt="%H:%M:%S"))
     logging.getLogger().addHandler(console)
 
-logging.info("=== Start run ===")
+# Move log I/O off the callers' threads: producers drop records on an
+# in-memory queue, a background listener owns the file/console writes.
+# The file handler additionally sits behind a MemoryHandler so disk writes
+# happen in 1000-record flushes (or immediately from ERROR upward).
+_root_logger = logging.getLogger()
+_log_queue = Queue(-1)
 
-# --------------------------
-# Config loading
-# --------------------------
-config = configparser.ConfigParser()
+_listener_handlers = []
+for _h in _root_logger.handlers:
+    if isinstance(_h, logging.FileHandler):
+        _h = MemoryHandler(1000, flushLevel=logging.ERROR, target=_h)
+    _listener_handlers.append(_h)
 
-script_dir = (
-    os.path.dirname(sys.executable)
-    if getattr(sys, "frozen", False)
-    else os.path.dirname(os.path.abspath(__file__))
-)
+_log_listener = QueueListener(_log_queue, *_listener_handlers, respect_handler_level=True)
+_root_logger.handlers = [QueueHandler(_log_queue)]
+_log_listener.start()
 
-config_path = os.path.join(script_dir, "config.ini")
-logging.info(f"Loading config from: {config_path}")
+logging.info("=== Start run ===")
 
-if not os.path.exists(config_path):
+if _config_missing:
+    logging.error(f"config.ini not found at: {config_path}")
+    _log_listener.stop()
+    for _h in _listener_handlers:
+        _h.flush()
     raise FileNotFoundError(f"config.ini not found at: {config_path}")
 
-config.read(config_path)
+# --------------------------
+# Settings (config already parsed above)
+# --------------------------
+logging.info(f"Config loaded from: {config_path}")
 
 server_name = config["Settings"]["ServerName"]
 database_name = config["Settings"]["DatabaseName"]
 sql_driver = config["Settings"]["SQLDriver"]
 store_number = int(config["Settings"]["StoreNumber"])
 
+# SMS store key (F1056); the export is filtered on store_number so every
+# header row in a run carries the same value
+STORE_NUMBER_STRING = f"00{store_number}"
+
 base_url = config["ImportOrders"]["BaseUrl"].rstrip("/")
 api_username = config["ImportOrders"]["Username"]
 api_password = config["ImportOrders"]["Password"]
 
+# Optional: load through session temp tables + INSERT...SELECT instead of
+# inserting straight into the TMP tables (off by default).
+use_staged_insert = config.getint("Settings", "UseStagedInsert", fallback=0) == 1
+
+# fast_executemany needs a recent ODBC driver; set to 0 on stores still running
+# older drivers to fall back to multi-row VALUES batching.
+use_fast_executemany = config.getint("Settings", "FastExecutemany", fallback=1) == 1
+
+
+CONN_STR = f"DRIVER={{{sql_driver}}};SERVER={server_name};DATABASE={database_name};Trusted_Connection=yes"
+
 
 def _get_sql_connection():
-    connection_string = f"DRIVER={{{sql_driver}}};SERVER={server_name};DATABASE={database_name};Trusted_Connection=yes"
     status("Connecting to SQL Server...", f"{server_name} / {database_name}")
-    conn = pyodbc.connect(connection_string)
+    conn = pyodbc.connect(CONN_STR)
     status("SQL connection established.")
     return conn
 
@@ -235,18 +324,19 @@ def _get_sql_connection():
 def open_and_validate_database_connection():
     status("Validating database connectivity...")
     conn = _get_sql_connection()
-    cur = conn.cursor()
-    cur.execute("SELECT 1")
-    cur.fetchone()
-    cur.close()
-    status("Database connectivity validated.")
+    # getinfo is answered by the driver from the live handle - no server round trip
+    dbms_name = conn.getinfo(pyodbc.SQL_DBMS_NAME)
+    status("Database connectivity validated.", f"DBMS={dbms_name}")
     return conn
 
 
 def safe_int(v, default=0):
+    # Happy path first: clean numeric data never enters the try/except
+    if v is None or v == "":
+        return default
+    if type(v) is int:
+        return v
     try:
-        if v is None or v == "":
-            return default
         return int(v)
     except Exception:
         return default
@@ -258,41 +348,62 @@ def safe_str(v):
     return str(v).strip()
 
 
-def get_job_id(auth_token):
+def login():
+    url = f"{base_url}/login"
+    payload = {"username": api_username, "password": api_password}
+
+    status("Connecting to Upshop API...", "Requesting auth token")
+    response_data = request_json("post", url, json_body=payload, timeout=90, context="Upshop /login")
+
+    auth_token = response_data.get("access_token")
+    if not auth_token:
+        ui_error("Auth token missing", "Upshop /login response has no access_token")
+        raise RuntimeError("Auth token missing in response.")
+
+    # Subsequent calls on the shared session reuse this bearer token.
+    SESSION.headers["Authorization"] = f"Bearer {auth_token}"
+    status("Auth token retrieved.")
+    return auth_token
+
+
+def get_job_id():
     url = f"{base_url}/export/orders"
-    headers = {
-        "Authorization": f"Bearer {auth_token}",
-        "Content-Type": "application/json",
-    }
     payload = {"approved_flag": True, "store_number": [store_number]}
 
     status("Creating export job...", "Upshop /export/orders")
-    resp_json = request_json("post", url, headers=headers, json_body=payload, timeout=90, context="Upshop /export/orders")
+    resp_json = request_json("post", url, json_body=payload, timeout=90, context="Upshop /export/orders")
 
     job_id = resp_json.get("job_id")
     status("Job created.", f"job_id={job_id}")
-    logging.info(f"Job creation API response: {json.dumps(resp_json)}")
+    # json.dumps of the full payload is itself O(N); skip it unless DEBUG is on
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        logging.debug("Job creation API response: %s", json.dumps(resp_json))
     return job_id
 
 
-def check_job_status(auth_token, job_id):
+def check_job_status(job_id):
     url = f"{base_url}/job_status/{job_id}"
-    headers = {"Authorization": f"Bearer {auth_token}"}
 
-    return request_json("get", url, headers=headers, timeout=90, context=f"Upshop /job_status/{job_id}")
+    return request_json("get", url, timeout=90, context=f"Upshop /job_status/{job_id}")
 
 
-def wait_for_job_completion(auth_token, job_id, poll_interval_seconds=5, timeout_seconds=1800):
+def wait_for_job_completion(job_id, base_poll_seconds=0.5, max_poll_seconds=15.0, timeout_seconds=1800):
+    """
+    Poll with exponential backoff + jitter: fast at first (catches short jobs
+    in under a second), then taper toward max_poll_seconds. Backoff resets on
+    every status change so transitions are tracked closely.
+    """
     terminal_success = {"finished"}
     terminal_failure = {"failed", "error", "cancelled", "canceled"}
 
     start = time.time()
     last_status = None
+    attempt = 0
 
     status("Waiting for job completion...", f"job_id={job_id}")
 
     while True:
-        status_payload = check_job_status(auth_token, job_id)
+        status_payload = check_job_status(job_id)
 
         status_raw = status_payload.get("status") or status_payload.get("state")
         status_val = (status_raw or "").strip().lower()
@@ -301,6 +412,7 @@ def wait_for_job_completion(auth_token, job_id, poll_interval_seconds=5, timeout
         if status_val != last_status:
             status("Job status changed", f"{last_status} -> {status_val} ({message})")
             last_status = status_val
+            attempt = 0
 
         if status_val in terminal_success:
             status("Job completed.", message or "")
@@ -316,55 +428,140 @@ def wait_for_job_completion(auth_token, job_id, poll_interval_seconds=5, timeout
             ui_error("Upshop job timeout", f"Last status={status_raw} | waited={timeout_seconds}s")
             raise TimeoutError(f"Job did not finish within {timeout_seconds}s. Last status={status_raw}")
 
-        time.sleep(poll_interval_seconds)
+        delay = min(max_poll_seconds, base_poll_seconds * (2 ** attempt)) * random.uniform(0.8, 1.2)
+        attempt += 1
+        time.sleep(delay)
+
+
+VENDOR_CACHE_TTL_SECONDS = 24 * 3600
+
+# When each cached vendor name was last fetched from VENDOR_TAB, keyed like
+# the cache itself. Stamped per entry (not per file) so entries expire 24h
+# after their own SQL lookup even when the tool runs more often than that.
+_vendor_cache_fetched = {}
+
+
+def _vendor_cache_path():
+    return os.path.join(base_dir, "vendor_cache.json")
+
+
+def load_vendor_cache():
+    """
+    Warm-start the vendor cache from the previous run so unchanged vendors
+    skip the SQL preload entirely. Entries older than 24h are discarded
+    (VENDOR_TAB changes slowly but not never).
+    """
+    try:
+        with open(_vendor_cache_path(), "r", encoding="utf-8") as f:
+            payload = json.load(f)
+
+        # legacy files carried one file-level timestamp instead of per-entry
+        file_ts = payload.get("updated_at", 0)
+        now = time.time()
+
+        vendor_cache = {}
+        for k, v in payload.get("vendors", {}).items():
+            if isinstance(v, (list, tuple)) and len(v) == 2:
+                name, fetched_at = v
+            else:
+                name, fetched_at = v, file_ts
+            if now - fetched_at > VENDOR_CACHE_TTL_SECONDS:
+                continue
+            key = safe_str(k)
+            vendor_cache[key] = safe_str(name)
+            _vendor_cache_fetched[key] = fetched_at
+
+        logging.info(f"Vendor cache warm-started with {len(vendor_cache)} entry(ies).")
+        return vendor_cache
+    except FileNotFoundError:
+        return {}
+    except Exception:
+        logging.exception("Failed to load vendor cache file; starting cold.")
+        return {}
+
 
+def save_vendor_cache(vendor_cache):
+    if not vendor_cache:
+        return
+    try:
+        # entries keep their own fetch time; ones without provenance get 0 so
+        # the next load re-resolves them
+        vendors = {
+            k: [v, _vendor_cache_fetched.get(k, 0)] for k, v in vendor_cache.items()
+        }
+        tmp_path = _vendor_cache_path() + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"vendors": vendors}, f)
+        os.replace(tmp_path, _vendor_cache_path())
+    except Exception:
+        logging.exception("Failed to save vendor cache file.")
 
-def get_vendor_name_cached(conn, vendor_number, vendor_cache):
-    key = safe_str(vendor_number)
 
-    if key in vendor_cache:
-        return vendor_cache[key]
+def preload_vendor_cache(conn, vendor_numbers, vendor_cache):
+    """
+    Resolve all vendor names in one IN-list SELECT instead of one round trip
+    per distinct vendor. Unknown vendors are cached as "" so the per-item
+    lookup never falls back to SQL.
+    """
+    pending = sorted({safe_str(v) for v in vendor_numbers if safe_str(v)} - set(vendor_cache))
+    if not pending:
+        return
 
+    status("Resolving vendor names...", f"{len(pending)} vendor(s)")
     try:
+        found = {}
         cur = conn.cursor()
-        cur.execute("SELECT F334 FROM VENDOR_TAB WHERE F27 = ?", str(vendor_number))
-        row = cur.fetchone()
+        # 1000 ids per IN list keeps the statement well under the 2100-parameter cap
+        for batch in _chunked(pending, 1000):
+            placeholders = ",".join("?" * len(batch))
+            cur.execute(
+                f"SELECT F27, LTRIM(RTRIM(F334)) FROM VENDOR_TAB WHERE F27 IN ({placeholders})",
+                batch,
+            )
+            found.update({safe_str(r[0]): r[1] or "" for r in cur.fetchall()})
         cur.close()
 
-        vendor_name = str(row[0]).strip() if row and row[0] is not None else ""
-        vendor_cache[key] = vendor_name
-        return vendor_name
-    except Exception as e:
-        logging.exception(f"Vendor lookup failed for vendor_number={vendor_number}: {e}")
-        vendor_cache[key] = ""
-        ui_warn("Vendor lookup failed", f"vendor={vendor_number} | {e}")
-        return ""
+        now = time.time()
+        for key in pending:
+            vendor_cache[key] = found.get(key, "")
+            _vendor_cache_fetched[key] = now
+    except pyodbc.Error as e:
+        logging.exception(f"Vendor preload failed for {len(pending)} vendor(s): {e}")
+        ui_warn("Vendor preload failed", str(e))
 
 
-def send_rechdr(conn, job_data_entry, vendor_cache):
-    cursor = conn.cursor()
+def get_vendor_name_cached(vendor_number, vendor_cache):
+    # The preload resolves every vendor (found or not) before the item loop,
+    # so this is a pure dict lookup with no SQL fallback.
+    return vendor_cache.get(safe_str(vendor_number), "")
 
-    case_order_number = job_data_entry.get("case_order_number")
-    effective_date = job_data_entry.get("effective_date")
-    store_number_local = job_data_entry.get("store_number")
-    approval_date = job_data_entry.get("approval_date")
-    vendor_number = job_data_entry.get("vendor_number")
 
-    vendor_name = get_vendor_name_cached(conn, vendor_number, vendor_cache)
-    sms_order_number = str(case_order_number)
+HDR_INSERT_SQL = """
+    INSERT INTO [dbo].[TMP_REC_BAT] (
+        [F1032], [F27], [F76], [F91], [F253], [F254], [F334], [F352], [F1035], [F1036],
+        [F1056], [F1057], [F1067], [F1068], [F1101], [F1126], [F1127], [F1246], [F1653]
+    ) VALUES (
+        ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
+    )
+"""
+
+
+# F352/F1035/F1036/F1056/F1057/F1067/F1068/F1101/F1126/F1127: fixed for every
+# header in a run, so build the middle of the row once
+HDR_CONST = (88454, 121609, 121609, STORE_NUMBER_STRING, "901", "OPEN", "ORDER", 1, 757, "Upshop Order")
 
-    query = """
-        INSERT INTO [dbo].[TMP_REC_BAT] (
-            [F1032], [F27], [F76], [F91], [F253], [F254], [F334], [F352], [F1035], [F1036],
-            [F1056], [F1057], [F1067], [F1068], [F1101], [F1126], [F1127], [F1246], [F1653]
-        ) VALUES (
-            ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
-        )
-    """
 
-    store_number_string = "00" + str(store_number_local)
+def build_hdr_row(job_data_entry, vendor_cache):
+    get = job_data_entry.get
+    case_order_number = get("case_order_number")
+    effective_date = get("effective_date")
+    approval_date = get("approval_date")
+    vendor_number = get("vendor_number")
 
-    values = (
+    vendor_name = get_vendor_name_cached(vendor_number, vendor_cache)
+    sms_order_number = str(case_order_number)
+
+    return (
         sms_order_number,
         vendor_number,
         approval_date,
@@ -372,47 +569,32 @@ def send_rechdr(conn, job_data_entry, vendor_cache):
         approval_date,
         effective_date,
         vendor_name,
-        88454,
-        121609,
-        121609,
-        store_number_string,
-        "901",
-        "OPEN",
-        "ORDER",
-        1,
-        757,
-        "Upshop Order",
+    ) + HDR_CONST + (
         effective_date,
         effective_date,
     )
 
-    cursor.execute(query, values)
-    conn.commit()
-    rows_affected = cursor.rowcount
-    cursor.close()
-    return rows_affected
 
+DTL_INSERT_SQL = """
+    INSERT INTO [dbo].[TMP_REC_DTL] (
+        [F1032], [F1101], [F01], [F03], [F1003], [F1041], [F1063], [F1067], [F1184], [F1887], [F75], [F76]
+    ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?)
+"""
 
-def send_recdtl(conn, job_data_entry, line_num):
-    cursor = conn.cursor()
 
-    case_order_number = safe_int(job_data_entry.get("case_order_number"))
-    department_number = safe_int(job_data_entry.get("department_number"))
-    sku = safe_str(job_data_entry.get("sku"))
-    description = safe_str(job_data_entry.get("description"))
-    order_quantity = safe_int(job_data_entry.get("order_quantity"), 0)
-    approval_date = job_data_entry.get("approval_date")
+def build_dtl_row(job_data_entry, line_num):
+    get = job_data_entry.get
+    case_order_number = safe_int(get("case_order_number"))
+    department_number = safe_int(get("department_number"))
+    sku = safe_str(get("sku"))
+    description = safe_str(get("description"))
+    order_quantity = safe_int(get("order_quantity"), 0)
+    approval_date = get("approval_date")
 
     if not sku:
         raise ValueError(f"SKU is empty (PO={case_order_number}, line={line_num})")
 
-    insert_query = """
-    INSERT INTO [dbo].[TMP_REC_DTL] (
-        [F1032], [F1101], [F01], [F03], [F1003], [F1041], [F1063], [F1067], [F1184], [F1887], [F75], [F76]
-    ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?)
-    """
-
-    insert_values = (
+    return (
         case_order_number,
         safe_int(line_num),
         sku,
@@ -427,11 +609,142 @@ def send_recdtl(conn, job_data_entry, line_num):
         approval_date,
     )
 
-    cursor.execute(insert_query, insert_values)
-    conn.commit()
-    rows_affected = cursor.rowcount
+
+HDR_COLUMNS = (
+    "F1032", "F27", "F76", "F91", "F253", "F254", "F334", "F352", "F1035", "F1036",
+    "F1056", "F1057", "F1067", "F1068", "F1101", "F1126", "F1127", "F1246", "F1653",
+)
+
+DTL_COLUMNS = (
+    "F1032", "F1101", "F01", "F03", "F1003", "F1041", "F1063", "F1067", "F1184", "F1887", "F75", "F76",
+)
+
+
+# Explicit ODBC bindings for the varchar columns (None keeps pyodbc's default
+# inference for that column). Locks the parameter metadata once per batch and
+# avoids the NVARCHAR upsizing that slows fast_executemany on some drivers.
+HDR_INPUT_SIZES = [
+    (pyodbc.SQL_VARCHAR, 20, 0),   # F1032 order number
+    None,                          # F27
+    None,                          # F76
+    None,                          # F91
+    None,                          # F253
+    None,                          # F254
+    (pyodbc.SQL_VARCHAR, 40, 0),   # F334 vendor name
+    None,                          # F352
+    None,                          # F1035
+    None,                          # F1036
+    (pyodbc.SQL_VARCHAR, 10, 0),   # F1056 store number
+    (pyodbc.SQL_VARCHAR, 10, 0),   # F1057
+    (pyodbc.SQL_VARCHAR, 10, 0),   # F1067
+    (pyodbc.SQL_VARCHAR, 10, 0),   # F1068
+    None,                          # F1101
+    None,                          # F1126
+    (pyodbc.SQL_VARCHAR, 30, 0),   # F1127
+    None,                          # F1246
+    None,                          # F1653
+]
+
+DTL_INPUT_SIZES = [
+    None,                          # F1032
+    None,                          # F1101
+    (pyodbc.SQL_VARCHAR, 20, 0),   # F01 UPC/SKU
+    None,                          # F03
+    None,                          # F1003
+    (pyodbc.SQL_VARCHAR, 80, 0),   # F1041 description
+    None,                          # F1063
+    (pyodbc.SQL_VARCHAR, 10, 0),   # F1067
+    (pyodbc.SQL_VARCHAR, 10, 0),   # F1184
+    (pyodbc.SQL_VARCHAR, 5, 0),    # F1887
+    None,                          # F75
+    None,                          # F76
+]
+
+
+def _staged_insert(cursor, table, columns, rows, input_sizes=None):
+    """
+    Load rows into an unindexed session temp table, then move them into the
+    real table with one set-based INSERT...SELECT. Cheaper than direct inserts
+    on large payloads because index maintenance happens in one pass.
+    """
+    col_list = ", ".join(f"[{c}]" for c in columns)
+    stg = f"#stg_{table.lower()}"
+    placeholders = ",".join("?" * len(columns))
+
+    cursor.execute(f"SELECT TOP 0 {col_list} INTO {stg} FROM [dbo].[{table}]")
+    cursor.setinputsizes(input_sizes)
+    for chunk in _chunked(rows):
+        cursor.executemany(f"INSERT INTO {stg} ({col_list}) VALUES ({placeholders})", chunk)
+    cursor.setinputsizes(None)
+    cursor.execute(f"INSERT INTO [dbo].[{table}] ({col_list}) SELECT {col_list} FROM {stg}")
+    cursor.execute(f"DROP TABLE {stg}")
+
+
+# SQL Server rejects RPCs with more than 2100 parameters, and pyodbc ships
+# parameterized statements as sp_executesql(@stmt, @params, ...) whose own two
+# arguments count toward that limit. 2000 leaves comfortable headroom.
+MAX_SQL_PARAMS = 2000
+
+# Rows per executemany call; bounds the driver's bind-array memory on very
+# large payloads without giving up batch throughput
+EXECUTEMANY_BATCH_SIZE = 10000
+
+
+def _chunked(rows, size=EXECUTEMANY_BATCH_SIZE):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def _multirow_insert(cursor, table, columns, rows):
+    """
+    Fallback batching for drivers without a usable fast_executemany: one
+    INSERT ... VALUES (?,...),(?,...),... per chunk, sized to stay under the
+    2100-parameter cap. Still one round trip and one plan per chunk.
+    """
+    col_list = ", ".join(f"[{c}]" for c in columns)
+    ncols = len(columns)
+    rows_per_stmt = max(1, MAX_SQL_PARAMS // ncols)
+    row_marker = "(" + ",".join("?" * ncols) + ")"
+    base_sql = f"INSERT INTO [dbo].[{table}] ({col_list}) VALUES "
+
+    for i in range(0, len(rows), rows_per_stmt):
+        chunk = rows[i:i + rows_per_stmt]
+        sql = base_sql + ",".join([row_marker] * len(chunk))
+        params = [value for row in chunk for value in row]
+        cursor.execute(sql, params)
+
+
+def insert_tmp_rows(conn, hdr_rows, dtl_rows):
+    """
+    Insert all TMP_REC_BAT and TMP_REC_DTL rows in two batched calls under one
+    transaction, instead of one round trip per item. The caller owns the
+    transaction: commit once on success, rollback on failure.
+    """
+    cursor = conn.cursor()
+    cursor.fast_executemany = use_fast_executemany
+
+    if use_staged_insert:
+        if hdr_rows:
+            _staged_insert(cursor, "TMP_REC_BAT", HDR_COLUMNS, hdr_rows, HDR_INPUT_SIZES)
+        if dtl_rows:
+            _staged_insert(cursor, "TMP_REC_DTL", DTL_COLUMNS, dtl_rows, DTL_INPUT_SIZES)
+    elif use_fast_executemany:
+        if hdr_rows:
+            cursor.setinputsizes(HDR_INPUT_SIZES)
+            for chunk in _chunked(hdr_rows):
+                cursor.executemany(HDR_INSERT_SQL, chunk)
+        if dtl_rows:
+            cursor.setinputsizes(DTL_INPUT_SIZES)
+            for chunk in _chunked(dtl_rows):
+                cursor.executemany(DTL_INSERT_SQL, chunk)
+    else:
+        if hdr_rows:
+            _multirow_insert(cursor, "TMP_REC_BAT", HDR_COLUMNS, hdr_rows)
+        if dtl_rows:
+            _multirow_insert(cursor, "TMP_REC_DTL", DTL_COLUMNS, dtl_rows)
+
     cursor.close()
-    return rows_affected
+    return len(hdr_rows), len(dtl_rows)
 
 
 def run_import():
@@ -444,37 +757,23 @@ def run_import():
     }
 
     conn = None
-    vendor_cache = {}
+    conn_future = None
+    vendor_cache = load_vendor_cache()
 
+    executor = ThreadPoolExecutor(max_workers=1)
     try:
+        # Open + validate SQL in the background while the API pipeline runs;
+        # the connection is ready by the time the job payload arrives.
         status("Opening database connection...")
-        conn = open_and_validate_database_connection()
-
-        # API: Login
-        status("Connecting to Upshop API...", "Requesting auth token")
-        urlt = f"{base_url}/login"
-        payloadt = {"username": api_username, "password": api_password}
-        headerst = {"Content-Type": "application/json"}
-
-        response_data = request_json(
-            "post",
-            urlt,
-            headers=headerst,
-            json_body=payloadt,
-            timeout=90,
-            context="Upshop /login"
-        )
+        conn_future = executor.submit(open_and_validate_database_connection)
 
-        auth_token = response_data.get("access_token")
-        if not auth_token:
-            ui_error("Auth token missing", "Upshop /login response has no access_token")
-            raise RuntimeError("Auth token missing in response.")
+        # API: Login + create job + poll
+        login()
+        job_id = get_job_id()
+        job_status = wait_for_job_completion(job_id)
 
-        status("Auth token retrieved.")
-
-        # API: Create job + poll
-        job_id = get_job_id(auth_token)
-        job_status = wait_for_job_completion(auth_token, job_id)
+        conn = conn_future.result()
+        conn_future = None
 
         data_items = job_status.get("data", [])
         status("Download complete.", f"{len(data_items)} item(s)")
@@ -484,33 +783,40 @@ def run_import():
             status("No approved orders found.", "0 order / 0 item.")
             return totals
 
+        # Resolve all vendor names up front (one round trip)
+        preload_vendor_cache(conn, (x.get("vendor_number") for x in data_items), vendor_cache)
+
         # Insert item in TMP tables
         status("Inserting into SMS TMP tables...")
-        seen_headers = set()
+        hdr_rows = {}
+        dtl_rows = []
         line_number = 1
+        item_count = len(data_items)
+        append_dtl_row = dtl_rows.append
 
         for item in data_items:
             totals["items_seen"] += 1
 
             sku = item.get("sku")
             po = item.get("case_order_number")
-            vendor_case_key = f"{item.get('vendor_number')}{po}"
+            # Tuple key: no string concat per item, and no "12"+"345" vs "1"+"2345" collision
+            vendor_case_key = (item.get("vendor_number"), po)
 
-            status("Importing item...", f"{line_number}/{len(data_items)} | PO={po} | SKU={sku}")
+            # Progress every 100 items (plus first/last); per-item pings would
+            # serialize the loop behind the UI queue and the log on big payloads
+            if line_number == 1 or line_number == item_count or line_number % 100 == 0:
+                status("Importing item...", f"{line_number}/{item_count} | PO={po} | SKU={sku}")
 
-            if vendor_case_key not in seen_headers:
+            if vendor_case_key not in hdr_rows:
                 try:
-                    inserted = send_rechdr(conn, item, vendor_cache)
-                    totals["hdr_inserts"] += inserted if inserted else 0
-                    seen_headers.add(vendor_case_key)
+                    hdr_rows[vendor_case_key] = build_hdr_row(item, vendor_cache)
                 except Exception as e:
                     totals["hdr_skipped"] += 1
                     logging.exception(f"Skipped TMP_REC_BAT for sku={sku}: {e}")
                     ui_error("Skipped TMP_REC_BAT", f"PO={po} | SKU={sku} | {e}")
 
             try:
-                inserted = send_recdtl(conn, item, line_number)
-                totals["dtl_inserts"] += inserted if inserted else 0
+                append_dtl_row(build_dtl_row(item, line_number))
             except Exception as e:
                 totals["dtl_skipped"] += 1
                 logging.exception(f"Skipped TMP_REC_DTL for sku={sku}: {e}")
@@ -518,16 +824,47 @@ def run_import():
 
             line_number += 1
 
+        # Debug-only: distinct vendor/PO pairs, from the dedup dict built in the
+        # main loop (no extra pass over the payload)
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug("Distinct vendor/PO pairs in payload: %s", sorted(map(str, hdr_rows)))
+
+        # Rows are built; release the parsed payload before the insert phase
+        # so raw items and insert tuples never peak in memory together.
+        job_status["data"] = None
+        del data_items
+
+        status("Writing TMP batches...", f"{len(hdr_rows)} header(s) / {len(dtl_rows)} detail row(s)")
+        try:
+            hdr_inserted, dtl_inserted = insert_tmp_rows(conn, list(hdr_rows.values()), dtl_rows)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        totals["hdr_inserts"] += hdr_inserted
+        totals["dtl_inserts"] += dtl_inserted
+
         if totals["hdr_skipped"] or totals["dtl_skipped"]:
             ui_warn(
                 "Import finished with skipped rows",
                 f"hdr_skipped={totals['hdr_skipped']} | dtl_skipped={totals['dtl_skipped']}"
             )
 
-        status("Import completed.", f"PO(s)={len(seen_headers)} | Items={totals['items_seen']}")
+        status("Import completed.", f"PO(s)={len(hdr_rows)} | Items={totals['items_seen']}")
         return totals
 
     finally:
+        # If the API phase failed while the connection was still opening,
+        # recover the handle so it gets closed below.
+        if conn is None and conn_future is not None:
+            try:
+                conn = conn_future.result(timeout=30)
+            except Exception:
+                logging.exception("Background SQL connection attempt failed.")
+        executor.shutdown(wait=False)
+
+        save_vendor_cache(vendor_cache)
+
         if conn is not None:
             try:
                 conn.close()
@@ -555,38 +892,43 @@ def run_import():
 
 
 def main():
-    if not UI_ENABLED:
-        run_import()
-        return
+    try:
+        if not UI_ENABLED:
+            run_import()
+            return
 
-    global ui
-    ui = StatusUI(title="Upshop Import", queue=ui_queue)
+        global ui
+        ui = StatusUI(title="Upshop Import", queue=ui_queue)
 
-    def worker():
-        try:
-            totals = run_import()
+        def worker():
+            try:
+                totals = run_import()
 
-            orders_imported = totals.get("hdr_inserts", 0)
-            items_seen = totals.get("items_seen", 0)
+                orders_imported = totals.get("hdr_inserts", 0)
+                items_seen = totals.get("items_seen", 0)
 
-            if items_seen == 0:
-                title = "No approved orders"
-                detail = "0 order / 0 item. You can close this window."
-            elif orders_imported == 0:
-                title = "No orders imported"
-                detail = f"{items_seen} item(s) downloaded but 0 order imported. You can close this window."
-            else:
-                title = "Done"
-                detail = f"{orders_imported} order(s) were imported. You can close this window."
+                if items_seen == 0:
+                    title = "No approved orders"
+                    detail = "0 order / 0 item. You can close this window."
+                elif orders_imported == 0:
+                    title = "No orders imported"
+                    detail = f"{items_seen} item(s) downloaded but 0 order imported. You can close this window."
+                else:
+                    title = "Done"
+                    detail = f"{orders_imported} order(s) were imported. You can close this window."
 
-            ui.root.after(0, ui.done, title, detail)
+                ui.root.after(0, ui.done, title, detail)
 
-        except Exception as e:
-            logging.exception(f"Import failed: {e}")
-            ui.root.after(0, ui.error, "Import failed", str(e))
+            except Exception as e:
+                logging.exception(f"Import failed: {e}")
+                ui.root.after(0, ui.error, "Import failed", str(e))
 
-    threading.Thread(target=worker, daemon=True).start()
-    ui.run()
+        threading.Thread(target=worker, daemon=True).start()
+        ui.run()
+    finally:
+        _log_listener.stop()
+        for _handler in _listener_handlers:
+            _handler.flush()
 
 
 if __name__ == "__main__":
@@ -6,15 +6,17 @@ from queue import Empty
 class StatusUI:
     """
     Small status window (Tkinter) that stays responsive while work runs in a background thread.
-    Uses a Queue (thread-safe) to receive updates.
+    Uses a thread-safe queue to receive updates; only put/get_nowait/Empty are
+    needed, so pass a queue.SimpleQueue (cheaper per op) rather than queue.Queue.
 
     Supported queue payloads:
       - (msg, detail)                         # legacy
       - (level, msg, detail)                  # new, level in {"INFO","WARN","ERROR","DONE"}
     """
 
-    def __init__(self, title="Upshop Import", queue=None):
+    def __init__(self, title="Upshop Import", queue=None, poll_ms=100):
         self.queue = queue
+        self.poll_ms = poll_ms
         self.root = tk.Tk()
         self.root.title(title)
         self.root.resizable(False, False)
@@ -25,9 +27,29 @@ class StatusUI:
         self.detail_var = tk.StringVar(value="")
         self.count_var = tk.StringVar(value="Errors: 0 | Warnings: 0")
 
+        # Consecutive empty pump ticks; drives the idle polling backoff
+        self._idle_ticks = 0
+
+        # Last values written to the StringVars; identical updates are skipped
+        # so repeated messages don't re-trigger the label traces.
+        self._last_msg = "Starting..."
+        self._last_detail = ""
+
         self.errors_count = 0
         self.warn_count = 0
 
+        # Snapshot of the counts last written to count_var; _refresh_counts
+        # skips the StringVar write when nothing changed.
+        self._last_counts = None
+
+        # Bound the message list: long runs with thousands of warnings would
+        # otherwise grow the message log (and every redraw) without limit.
+        self.MAX_MESSAGES = 5000
+        self.dropped_count = 0
+
+        # Most items drained per pump tick before yielding back to Tk
+        self.MAX_DRAIN_PER_TICK = 256
+
         ttk.Label(
             self.root, text="Upshop Order Import", font=("Segoe UI", 12, "bold")
         ).pack(pady=(10, 4))
@@ -37,7 +59,8 @@ class StatusUI:
 
         self.pb = ttk.Progressbar(self.root, mode="indeterminate")
         self.pb.pack(fill="x", padx=16, pady=(12, 8))
-        self.pb.start(10)
+        # 50ms animation steps: still smooth, 5x fewer event-loop callbacks than 10ms
+        self.pb.start(50)
 
         # ---- Errors / warnings area
         frame = ttk.Frame(self.root)
@@ -49,8 +72,10 @@ class StatusUI:
         ttk.Label(header, text="Messages (errors/warnings):", font=("Segoe UI", 9, "bold")).pack(side="left")
         ttk.Label(header, textvariable=self.count_var, font=("Segoe UI", 9)).pack(side="right")
 
-        self.listbox = tk.Listbox(frame, height=10)
-        self.listbox.pack(fill="both", expand=True)
+        # The message log widget is created lazily on the first WARN/ERROR —
+        # clean runs never pay for it. See _ensure_listbox.
+        self._msg_frame = frame
+        self.listbox = None
 
         btn_row = ttk.Frame(self.root)
         btn_row.pack(fill="x", padx=16, pady=(0, 10))
@@ -69,22 +94,65 @@ class StatusUI:
             return
         self.root.destroy()
 
+    def _ensure_listbox(self):
+        """Create the message log on first use.
+
+        Text widget instead of Listbox: its line-based storage stays fast at
+        thousands of lines, where Listbox redraws degrade. Kept read-only
+        (state="disabled") except while we mutate it.
+        """
+        if self.listbox is None:
+            self.listbox = tk.Text(self._msg_frame, height=10, wrap="none", state="disabled")
+            self.listbox.pack(fill="both", expand=True)
+            self.listbox.tag_configure("ERROR", foreground="red")
+            self.listbox.tag_configure("WARN", foreground="orange")
+
     def _clear_messages(self):
-        self.listbox.delete(0, "end")
+        if self.listbox is not None:
+            self.listbox.configure(state="normal")
+            self.listbox.delete("1.0", "end")
+            self.listbox.configure(state="disabled")
         self.errors_count = 0
         self.warn_count = 0
+        self.dropped_count = 0
         self._refresh_counts()
 
     def _refresh_counts(self):
-        self.count_var.set(f"Errors: {self.errors_count} | Warnings: {self.warn_count}")
+        cur = (self.errors_count, self.warn_count, self.dropped_count)
+        if cur == self._last_counts:
+            return
+        self._last_counts = cur
+        text = f"Errors: {cur[0]} | Warnings: {cur[1]}"
+        if cur[2]:
+            text += f" | {cur[2]} older dropped"
+        self.count_var.set(text)
+
+    def _trim_messages(self):
+        # every message ends with "\n", so line count is end-1c's line - 1
+        size = int(self.listbox.index("end-1c").split(".")[0]) - 1
+        if size > self.MAX_MESSAGES:
+            excess = size - self.MAX_MESSAGES
+            # one ranged delete from the head (single Tcl call)
+            self.listbox.configure(state="normal")
+            self.listbox.delete("1.0", f"{excess + 1}.0")
+            self.listbox.configure(state="disabled")
+            self.dropped_count += excess
+            self._refresh_counts()
+
+    def _format_line(self, level: str, msg: str, detail: str):
+        if detail:
+            return "[%s] %s | %s" % (level, msg, detail)
+        return "[%s] %s" % (level, msg)
 
     def _append_message(self, level: str, msg: str, detail: str):
         level = (level or "INFO").upper()
-        line = f"[{level}] {msg}"
-        if detail:
-            line += f" | {detail}"
-        self.listbox.insert("end", line)
-        self.listbox.yview_moveto(1)
+        self._ensure_listbox()
+        self.listbox.configure(state="normal")
+        self.listbox.insert("end", self._format_line(level, msg, detail) + "\n", level)
+        self.listbox.configure(state="disabled")
+        self._trim_messages()
+        # see() early-outs when the end is already visible
+        self.listbox.see("end")
 
         if level == "ERROR":
             self.errors_count += 1
@@ -94,8 +162,12 @@ class StatusUI:
         self._refresh_counts()
 
     def set(self, msg, detail=""):
-        self.msg_var.set(msg)
-        self.detail_var.set(detail)
+        if msg != self._last_msg:
+            self.msg_var.set(msg)
+            self._last_msg = msg
+        if detail != self._last_detail:
+            self.detail_var.set(detail)
+            self._last_detail = detail
 
     def done(self, msg="Done", detail=""):
         self.pb.stop()
@@ -112,31 +184,52 @@ class StatusUI:
 
     def pump_queue(self):
         """
-        Pull UI updates from queue every 100ms.
+        Pull UI updates from queue every poll_ms (default 100ms).
         Accepts both old format (msg, detail) and new (level, msg, detail).
+        Plain status updates are coalesced: only the last one of a tick is
+        rendered, so a burst of progress pings costs one StringVar write.
+        WARN/ERROR lines are collected and written to the message log in one
+        pass per tick.
         """
+        latest = None
+        pending_lines = []
+        delta_err = 0
+        delta_warn = 0
+        processed = 0
+
         if self.queue is not None:
             try:
-                while True:
+                # cap per-tick work so a flooding worker can't starve redraws
+                while processed < self.MAX_DRAIN_PER_TICK:
                     item = self.queue.get_nowait()
+                    processed += 1
+
+                    # dispatch on payload length; non-sized payloads fall through
+                    try:
+                        n = len(item)
+                    except TypeError:
+                        n = 0
 
                     # legacy: (msg, detail)
-                    if isinstance(item, tuple) and len(item) == 2:
-                        msg, detail = item
-                        self.set(msg, detail)
+                    if n == 2:
+                        latest = item
                         continue
 
                     # new: (level, msg, detail)
-                    if isinstance(item, tuple) and len(item) == 3:
+                    if n == 3:
                         level, msg, detail = item
                         level = (level or "INFO").upper()
 
-                        # always update top status
-                        self.set(msg, detail)
+                        # top status shows the newest message of the tick
+                        latest = (msg, detail)
 
-                        # record warnings/errors in list
-                        if level in ("WARN", "ERROR"):
-                            self._append_message(level, msg, detail)
+                        # collect warnings/errors; the text widget is touched once below
+                        if level == "ERROR":
+                            pending_lines.append((self._format_line(level, msg, detail), level))
+                            delta_err += 1
+                        elif level == "WARN":
+                            pending_lines.append((self._format_line(level, msg, detail), level))
+                            delta_warn += 1
 
                         # optional: if you send DONE through queue
                         if level == "DONE":
@@ -145,16 +238,45 @@ class StatusUI:
                         continue
 
                     # fallback: unknown payload -> show it
-                    self.set(str(item), "")
+                    latest = (str(item), "")
 
             except Empty:
                 pass
 
-        self.root.after(100, self.pump_queue)
+        if latest is not None:
+            self.set(latest[0], latest[1])
+
+        if pending_lines:
+            self._ensure_listbox()
+            self.listbox.configure(state="normal")
+            for line, level in pending_lines:
+                self.listbox.insert("end", line + "\n", level)
+            self.listbox.configure(state="disabled")
+            self._trim_messages()
+            self.listbox.see("end")
+            self.errors_count += delta_err
+            self.warn_count += delta_warn
+            self._refresh_counts()
+
+        # Back off up to 8x poll_ms while nothing is arriving; reset on
+        # activity. If we hit the drain cap, come back as soon as the event
+        # loop has painted.
+        if processed >= self.MAX_DRAIN_PER_TICK:
+            self._idle_ticks = 0
+            delay = 0
+        elif processed:
+            self._idle_ticks = 0
+            delay = self.poll_ms
+        else:
+            self._idle_ticks += 1
+            delay = self.poll_ms * (1 << min(self._idle_ticks, 3))
+
+        self.root.after(delay, self.pump_queue)
 
     def run(self):
         """
-        Start UI loop. Call pump_queue() before mainloop to enable queue updates.
+        Start UI loop. The first pump is scheduled via after_idle so anything
+        the worker queued before mainloop starts is drained immediately.
         """
-        self.pump_queue()
+        self.root.after_idle(self.pump_queue)
         self.root.mainloop()